@@ -0,0 +1,24 @@
+"""In-process DNS lookups, replacing ``nslookup`` subprocess calls."""
+
+from .aio import AsyncResolver, resolve_as_completed, resolve_many
+from .cache import Cache
+from .metrics import Metrics, default_metrics
+from .resolver import ResolveError, Resolver, Timeout, resolve
+from .result import LookupResult
+from .wire import Message, Record
+
+__all__ = [
+    'AsyncResolver',
+    'Cache',
+    'LookupResult',
+    'Message',
+    'Metrics',
+    'Record',
+    'ResolveError',
+    'Resolver',
+    'Timeout',
+    'default_metrics',
+    'resolve',
+    'resolve_as_completed',
+    'resolve_many',
+]
@@ -0,0 +1,191 @@
+"""asyncio resolver and batch helpers that keep many queries in flight."""
+
+import asyncio
+import socket
+import struct
+import time
+
+from . import wire
+from .cache import Cache
+from .metrics import default_metrics
+from .resolver import (DEFAULT_PORT, UDP_PAYLOAD, Timeout, address_family, attempts,
+                       is_reply, is_truncated, new_query_id, read_nameservers)
+from .result import LookupResult
+
+# socket.timeout and asyncio.TimeoutError only became aliases of TimeoutError
+# in Python 3.10 and 3.11 respectively.
+TIMEOUT_ERRORS = (TimeoutError, socket.timeout, asyncio.TimeoutError)
+
+
+class AsyncResolver:
+    """Coroutine counterpart of :class:`dnslookup.Resolver`.
+
+    ``timeout`` bounds each attempt against one nameserver; ``retries`` is the
+    number of extra passes over the nameserver list.  With a ``cache``,
+    concurrent lookups of the same name share a single query.  As with
+    Resolver, the resolv.conf search list is not applied.
+    """
+
+    def __init__(self, nameservers=None, port=DEFAULT_PORT, timeout=2.0, retries=2,
+                 cache=None, metrics=None):
+        self.nameservers = list(nameservers or read_nameservers())
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.cache = cache
+        self.metrics = metrics or default_metrics
+        if cache is not None and cache.metrics is None:
+            cache.metrics = self.metrics
+        self._inflight = {}
+
+    async def query(self, name, rdtype='A'):
+        if self.cache is None:
+            return await self._query(name, rdtype)
+        result = self.cache.get(name, rdtype)
+        if result is not None:
+            return result
+        key = self.cache.key(name, rdtype)
+        shared = self._inflight.get(key)
+        if shared is None:
+            shared = self._inflight[key] = asyncio.ensure_future(self._fill(name, rdtype))
+            shared.add_done_callback(lambda task: self._settle(key, task))
+        # shield() so that one cancelled caller does not cancel the others.
+        return await asyncio.shield(shared)
+
+    async def _fill(self, name, rdtype):
+        result = await self._query(name, rdtype)
+        self.cache.put(name, rdtype, result)
+        return result
+
+    def _settle(self, key, task):
+        del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark as retrieved even if every caller went away
+
+    async def _query(self, name, rdtype):
+        start = time.perf_counter()
+        self.metrics.started()
+        rcode = None
+        try:
+            for attempt, server in enumerate(attempts(self.nameservers, self.retries)):
+                if attempt:
+                    self.metrics.retried()
+                qid = new_query_id()
+                request = wire.build_query(name, rdtype, qid)
+                attempt_start = time.perf_counter()
+                try:
+                    data = await asyncio.wait_for(self._udp(server, request, qid), self.timeout)
+                    if is_truncated(data):
+                        data = await asyncio.wait_for(self._tcp(server, request), self.timeout)
+                    msg = wire.parse_response(data)
+                except (OSError, ValueError, asyncio.TimeoutError) as exc:
+                    self.metrics.attempt_failed(server, isinstance(exc, TIMEOUT_ERRORS))
+                    continue
+                if not is_reply(msg, qid, name, rdtype):
+                    self.metrics.attempt_failed(server)
+                    continue
+                self.metrics.attempt_answered(server, time.perf_counter() - attempt_start)
+                result = LookupResult.from_message(msg, server, time.perf_counter() - start)
+                rcode = result.rcode
+                return result
+            rcode = 'TIMEOUT'
+            raise Timeout(name)
+        finally:
+            self.metrics.finished(time.perf_counter() - start, rcode)
+
+    async def _udp(self, server, request, qid):
+        loop = asyncio.get_running_loop()
+        # A plain non-blocking socket is much cheaper to set up per query than
+        # a datagram transport, and still gives every query its own port.
+        with socket.socket(address_family(server), socket.SOCK_DGRAM) as sock:
+            sock.setblocking(False)
+            sock.connect((server, self.port))
+            sock.send(request)
+            while True:
+                data = await loop.sock_recv(sock, UDP_PAYLOAD)
+                if len(data) >= 2 and int.from_bytes(data[:2], 'big') == qid:
+                    return data
+
+    async def _tcp(self, server, request):
+        reader, writer = await asyncio.open_connection(server, self.port)
+        try:
+            writer.write(struct.pack('!H', len(request)) + request)
+            size = struct.unpack('!H', await reader.readexactly(2))[0]
+            return await reader.readexactly(size)
+        except asyncio.IncompleteReadError as exc:
+            raise ConnectionError('connection closed by nameserver') from exc
+        finally:
+            writer.close()
+
+
+async def _lookup(resolver, index, name, rdtype):
+    try:
+        result = await resolver.query(name, rdtype)
+    except (Timeout, ValueError) as exc:
+        result = exc
+    return index, name, result
+
+
+async def _aiter(iterable):
+    for item in iterable:
+        yield item
+
+
+async def _as_completed(domains, rdtype, concurrency, resolver):
+    if concurrency < 1:
+        raise ValueError('concurrency must be at least 1')
+    resolver = resolver or AsyncResolver(cache=Cache())
+    source = domains if hasattr(domains, '__aiter__') else _aiter(domains)
+    # A slot is held from submission until the result has been yielded, so
+    # lookups in flight plus results not yet consumed never exceed concurrency.
+    slots = asyncio.Semaphore(concurrency)
+    finished = asyncio.Queue()
+    running = set()
+
+    async def feed():
+        index = 0
+        async for name in source:
+            await slots.acquire()
+            task = asyncio.ensure_future(_lookup(resolver, index, name, rdtype))
+            running.add(task)
+            task.add_done_callback(finished.put_nowait)
+            index += 1
+
+    feeder = asyncio.ensure_future(feed())
+    feeder.add_done_callback(lambda _: finished.put_nowait(None))
+    fed = False
+    try:
+        while not fed or running:
+            task = await finished.get()
+            if task is None:
+                fed = True
+                feeder.result()
+                continue
+            running.discard(task)
+            yield task.result()
+            slots.release()
+    finally:
+        feeder.cancel()
+        for task in running:
+            task.cancel()
+
+
+async def resolve_as_completed(domains, rdtype='A', *, concurrency=64, resolver=None):
+    """Yield ``(name, result)`` pairs as lookups finish.
+
+    ``domains`` may be any iterable or async iterable and is consumed lazily,
+    so at most ``concurrency`` lookups are in flight at once.  ``result`` is a
+    :class:`LookupResult`, or the exception (for example :class:`Timeout`)
+    raised by that lookup.
+    """
+    async for _, name, result in _as_completed(domains, rdtype, concurrency, resolver):
+        yield name, result
+
+
+async def resolve_many(domains, rdtype='A', *, concurrency=64, resolver=None):
+    """Resolve ``domains`` concurrently and return the results in input order."""
+    results = []
+    async for index, _, result in _as_completed(domains, rdtype, concurrency, resolver):
+        results.extend([None] * (index + 1 - len(results)))
+        results[index] = result
+    return results
@@ -0,0 +1,211 @@
+"""Offline lookup benchmark against a loopback :class:`StubServer`.
+
+Usage: python -m dnslookup.bench [--count N] [--path NAME ...] [--json]
+
+Each path runs in its own worker process so that peak RSS is not shared
+between paths.  The ``subprocess`` path reproduces the original
+``check_output('nslookup ...', shell=True)`` call and is skipped when
+nslookup is not installed.
+
+Every path runs the same name mix: fast, slow, NXDOMAIN and SERVFAIL names.
+Unanswered names are left out, because each one costs exactly the timeout,
+which would set p99 and skew lookups/s for every path (and nslookup cannot
+honour timeouts under one second).  The subprocess path runs only the first
+--subprocess-count names of the same list.  The stub server is itself
+Python, so absolute rates are capped by it; compare paths against each
+other rather than read the numbers as nameserver capacity.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import resource
+import shlex
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+from .aio import AsyncResolver, resolve_many
+from .cache import Cache
+from .resolver import Resolver, Timeout
+from .stub import StubServer, Zone
+
+PATHS = ('subprocess', 'sync', 'sync-cached', 'async', 'async-cached')
+DOMAIN = 'bench.test'
+SLOW_DELAY = 0.02
+
+# Share of the workload per kind of name; 'fast' takes the remainder.
+MIX = {'slow': 0.05, 'nx': 0.05, 'fail': 0.05}
+
+
+def build_zone(distinct):
+    zone = Zone(ttl=300)
+    for i in range(distinct):
+        zone.add(f'host{i}.fast.{DOMAIN}', 'A', f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}')
+        zone.add(f'host{i}.slow.{DOMAIN}', 'A', '10.255.0.1')
+        zone.set_delay(f'host{i}.slow.{DOMAIN}', SLOW_DELAY)
+        zone.add_servfail(f'host{i}.fail.{DOMAIN}')
+    return zone
+
+
+def workload(count, distinct, seed):
+    rng = random.Random(seed)
+    kinds = list(MIX) + ['fast']
+    weights = list(MIX.values()) + [1 - sum(MIX.values())]
+    return [f'host{rng.randrange(distinct)}.{kind}.{DOMAIN}'
+            for kind in rng.choices(kinds, weights, k=count)]
+
+
+def peak_rss_kb(who=resource.RUSAGE_SELF):
+    rss = resource.getrusage(who).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def run_subprocess(names, port, timeout):
+    latencies, failed = [], 0
+    for name in names:
+        start = time.perf_counter()
+        try:
+            subprocess.check_output(
+                f'nslookup -port={port} -timeout={max(1, math.ceil(timeout))} -retry=1 '
+                f'{shlex.quote(name)} 127.0.0.1',
+                shell=True, encoding='UTF-8', stderr=subprocess.DEVNULL)
+        except subprocess.CalledProcessError:
+            failed += 1
+        latencies.append(time.perf_counter() - start)
+    return latencies, failed
+
+
+def run_sync(names, resolver):
+    latencies, failed = [], 0
+    for name in names:
+        start = time.perf_counter()
+        try:
+            failed += not resolver.query(name).ok
+        except Timeout:
+            failed += 1
+        latencies.append(time.perf_counter() - start)
+    return latencies, failed
+
+
+class _Timed:
+    """Wrap an AsyncResolver and record how long each query takes."""
+
+    def __init__(self, resolver):
+        self.resolver = resolver
+        self.latencies = []
+
+    async def query(self, name, rdtype):
+        start = time.perf_counter()
+        try:
+            return await self.resolver.query(name, rdtype)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+
+def run_async(names, resolver, concurrency):
+    timed = _Timed(resolver)
+    results = asyncio.run(resolve_many(names, concurrency=concurrency, resolver=timed))
+    failed = sum(isinstance(result, Exception) or not result.ok for result in results)
+    return timed.latencies, failed
+
+
+def run_worker(args):
+    names = workload(args.count, args.distinct, args.seed)
+    if args.worker == 'subprocess':
+        names = names[:args.subprocess_count]
+    cache = Cache() if args.worker.endswith('-cached') else None
+    options = dict(port=args.port, timeout=args.timeout, retries=0, cache=cache)
+    start = time.perf_counter()
+    if args.worker == 'subprocess':
+        latencies, failed = run_subprocess(names, args.port, args.timeout)
+    elif args.worker.startswith('sync'):
+        latencies, failed = run_sync(names, Resolver(['127.0.0.1'], **options))
+    else:
+        latencies, failed = run_async(names, AsyncResolver(['127.0.0.1'], **options),
+                                      args.concurrency)
+    seconds = time.perf_counter() - start
+    percentiles = statistics.quantiles(latencies, n=100, method='inclusive')
+    return {
+        'path': args.worker,
+        'lookups': len(names),
+        'failed': failed,
+        'seconds': seconds,
+        'lookups_per_sec': len(names) / seconds,
+        'p50_ms': percentiles[49] * 1000,
+        'p99_ms': percentiles[98] * 1000,
+        'rss_kb': peak_rss_kb() + peak_rss_kb(resource.RUSAGE_CHILDREN),
+    }
+
+
+def spawn_worker(path, port, args):
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [package_root, env.get('PYTHONPATH')]))
+    command = [sys.executable, '-m', 'dnslookup.bench', '--worker', path, '--port', str(port),
+               '--count', str(args.count), '--distinct', str(args.distinct),
+               '--seed', str(args.seed), '--concurrency', str(args.concurrency),
+               '--timeout', str(args.timeout), '--subprocess-count', str(args.subprocess_count)]
+    output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def format_table(rows):
+    lines = [f'{"path":<14}{"lookups":>9}{"failed":>8}{"lookups/s":>12}'
+             f'{"p50 ms":>9}{"p99 ms":>9}{"RSS KiB":>10}']
+    for row in rows:
+        lines.append(f'{row["path"]:<14}{row["lookups"]:>9}{row["failed"]:>8}'
+                     f'{row["lookups_per_sec"]:>12.0f}{row["p50_ms"]:>9.2f}'
+                     f'{row["p99_ms"]:>9.2f}{row["rss_kb"]:>10}')
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='dnslookup.bench', description='Benchmark lookup paths against a local stub server.')
+    parser.add_argument('--path', action='append', choices=PATHS, dest='paths',
+                        help='path to run (repeatable; default: all)')
+    parser.add_argument('--count', type=int, default=5000, help='lookups per path')
+    parser.add_argument('--distinct', type=int, default=500, help='distinct names per kind')
+    parser.add_argument('--subprocess-count', type=int, default=200,
+                        help='lookups for the subprocess path, which is far slower')
+    parser.add_argument('--concurrency', type=int, default=256)
+    parser.add_argument('--timeout', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print JSON Lines instead of a table')
+    parser.add_argument('--worker', choices=PATHS, help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.count < 2 or args.subprocess_count < 2:
+        parser.error('need at least two lookups to report percentiles')
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.worker:
+        print(json.dumps(run_worker(args)))
+        return 0
+    paths = args.paths or list(PATHS)
+    if 'subprocess' in paths and shutil.which('nslookup') is None:
+        print('nslookup not found; skipping the subprocess path', file=sys.stderr)
+        paths.remove('subprocess')
+    rows = []
+    with StubServer(build_zone(args.distinct)) as server:
+        for path in paths:
+            rows.append(spawn_worker(path, server.port, args))
+    if args.json:
+        for row in rows:
+            print(json.dumps(row))
+    else:
+        print(format_table(rows))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""TTL-aware LRU cache for lookup results."""
+
+import threading
+import time
+from collections import OrderedDict
+
+from . import wire
+
+NEGATIVE_RCODES = ('SERVFAIL', 'NXDOMAIN')
+
+
+class Cache:
+    """Map ``(name, rdtype)`` to the last answer until its TTL runs out.
+
+    Positive answers live for the smallest TTL in the answer section (capped
+    at ``max_ttl``).  NXDOMAIN, SERVFAIL and empty NOERROR answers are kept for
+    ``negative_ttl`` seconds.  Once ``maxsize`` entries are stored the least
+    recently used one is evicted.
+
+    Every lookup is also reported to ``metrics`` (a
+    :class:`dnslookup.metrics.Metrics`) when one is set; a resolver given a
+    cache without one attaches its own.
+    """
+
+    def __init__(self, maxsize=10000, negative_ttl=30, max_ttl=86400, clock=time.monotonic,
+                 metrics=None):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.maxsize = maxsize
+        self.negative_ttl = negative_ttl
+        self.max_ttl = max_ttl
+        self.clock = clock
+        self.metrics = metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(name, rdtype):
+        return wire.normalize_name(name), wire.rdtype_code(rdtype)
+
+    def get(self, name, rdtype='A'):
+        """Return the cached answer for ``name``/``rdtype``, or None."""
+        key = self.key(name, rdtype)
+        result = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self.clock():
+                    self._entries.move_to_end(key)
+                    result = entry[1]
+                else:
+                    del self._entries[key]
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if self.metrics is not None:
+            self.metrics.cache_lookup(result is not None)
+        return result
+
+    def put(self, name, rdtype, result):
+        ttl = self.ttl_for(result)
+        if ttl <= 0:
+            return
+        key = self.key(name, rdtype)
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def ttl_for(self, result):
+        """Return how long ``result`` may be cached; 0 means not at all."""
+        if result.rcode in NEGATIVE_RCODES or (result.ok and not result.ttls):
+            return self.negative_ttl
+        if not result.ok:
+            return 0
+        return min(min(result.ttls), self.max_ttl)
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            'size': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hit_ratio,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,161 @@
+"""Stream domain names in and write one JSON line per lookup result.
+
+Usage: python -m dnslookup [-t TYPE] [-c CONCURRENCY] [FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import stat
+import sys
+
+from . import wire
+from .aio import AsyncResolver, resolve_as_completed
+from .cache import Cache
+from .metrics import default_metrics
+from .resolver import DEFAULT_PORT
+
+# Input lines longer than this many bytes cannot be names; only their head is kept.
+LINE_LIMIT = 2 ** 16
+# Bytes of an over-long input line kept for its error record.
+LONG_LINE_HEAD = 256
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='dnslookup', description='Resolve domain names and emit JSON Lines.')
+    parser.add_argument('input', nargs='?', default='-',
+                        type=argparse.FileType('rb'),
+                        help='file with one domain per line (default: stdin)')
+    parser.add_argument('-t', '--type', default='A', dest='rdtype', help='record type')
+    parser.add_argument('-c', '--concurrency', type=int, default=256,
+                        help='maximum lookups in flight')
+    parser.add_argument('-s', '--server', action='append', dest='servers',
+                        help='nameserver address (repeatable; default: resolv.conf)')
+    parser.add_argument('-p', '--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--timeout', type=float, default=2.0,
+                        help='seconds to wait for each attempt')
+    parser.add_argument('--retries', type=int, default=2)
+    parser.add_argument('--cache-size', type=int, default=10000,
+                        help='cached answers to keep; 0 disables the cache')
+    parser.add_argument('--metrics', action='store_true',
+                        help='write lookup metrics as JSON to stderr on exit')
+    args = parser.parse_args(argv)
+    try:
+        wire.rdtype_code(args.rdtype)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.concurrency < 1:
+        parser.error('--concurrency must be at least 1')
+    return args
+
+
+async def read_lines(f):
+    """Yield the lines of the binary file ``f``, decoded as UTF-8.
+
+    Undecodable bytes are replaced.  A line over LINE_LIMIT bytes is cut to
+    its first LONG_LINE_HEAD bytes so the resolver reports it as invalid.
+    Pipes and terminals are read through the event loop so that a slow
+    producer does not hold back results that are already available.
+    """
+    if stat.S_ISREG(os.fstat(f.fileno()).st_mode):
+        for line in file_lines(f):
+            yield line.decode('utf-8', 'replace')
+        return
+    async for line in pipe_lines(f):
+        yield line.decode('utf-8', 'replace')
+
+
+def file_lines(f):
+    while True:
+        line = f.readline(LINE_LIMIT)
+        if not line:
+            return
+        if len(line) == LINE_LIMIT and not line.endswith(b'\n'):
+            line = line[:LONG_LINE_HEAD]
+            while True:
+                rest = f.readline(LINE_LIMIT)
+                if not rest or rest.endswith(b'\n'):
+                    break
+        yield line
+
+
+async def pipe_lines(f):
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=LINE_LIMIT)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), f)
+    while True:
+        try:
+            line = await reader.readuntil(b'\n')
+        except asyncio.IncompleteReadError as exc:
+            if exc.partial:
+                yield exc.partial
+            return
+        except asyncio.LimitOverrunError as exc:
+            line = (await reader.readexactly(exc.consumed))[:LONG_LINE_HEAD]
+            await skip_line(reader)
+        yield line
+
+
+async def skip_line(reader):
+    """Discard input up to and including the next newline (or EOF)."""
+    while True:
+        try:
+            await reader.readuntil(b'\n')
+            return
+        except asyncio.LimitOverrunError as exc:
+            await reader.readexactly(exc.consumed)
+        except asyncio.IncompleteReadError:
+            return
+
+
+async def read_names(f):
+    """Yield domain names from ``f``, skipping blank lines and comments."""
+    async for line in read_lines(f):
+        name = line.strip()
+        if name and not name.startswith('#'):
+            yield name
+
+
+def format_result(name, result):
+    """Build the output record for ``name`` exactly as it was read.
+
+    Output is in completion order, so ``name`` is what ties a record to its
+    input line; the name the server echoed back goes under ``qname``.
+    """
+    if isinstance(result, Exception):
+        return {'name': name, 'error': str(result)}
+    fields = result.as_dict()
+    fields['qname'] = fields.pop('name')
+    return {'name': name, **fields}
+
+
+async def run(args, infile, outfile):
+    cache = Cache(args.cache_size) if args.cache_size > 0 else None
+    resolver = AsyncResolver(args.servers, port=args.port, timeout=args.timeout,
+                             retries=args.retries, cache=cache)
+    names = read_names(infile)
+    async for name, result in resolve_as_completed(
+            names, args.rdtype, concurrency=args.concurrency, resolver=resolver):
+        outfile.write(json.dumps(format_result(name, result), separators=(',', ':')) + '\n')
+        outfile.flush()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.metrics:
+        default_metrics.dump_at_exit()
+    infile = args.input
+    try:
+        asyncio.run(run(args, infile, sys.stdout))
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        # Downstream closed early (e.g. piped into head); silence the flush at exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        if infile is not sys.stdin.buffer:
+            infile.close()
+    return 0
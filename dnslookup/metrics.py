@@ -0,0 +1,179 @@
+"""Lookup latency and outcome counters shared by the resolvers."""
+
+import atexit
+import bisect
+import json
+import sys
+import threading
+from collections import Counter
+
+# Upper bounds of the latency buckets, in seconds; one more bucket catches the rest.
+LATENCY_BOUNDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+
+    def __init__(self, bounds=LATENCY_BOUNDS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q):
+        """Return the upper bound of the bucket holding quantile ``q``.
+
+        Values past the last bound report that bound, so treat the result
+        as a lower bound there.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.bounds[-1]
+
+    def snapshot(self):
+        buckets = {f'{bound * 1000:g}': count for bound, count in zip(self.bounds, self.counts)}
+        buckets['inf'] = self.counts[-1]
+        return {
+            'count': self.count,
+            'mean': self.total / self.count * 1000 if self.count else 0.0,
+            'p50': self.quantile(0.5) * 1000,
+            'p99': self.quantile(0.99) * 1000,
+            'buckets': buckets,
+        }
+
+
+class ServerStats:
+    """Outcome of individual attempts against one nameserver."""
+
+    def __init__(self):
+        self.answers = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.latency = Histogram()
+
+    def snapshot(self):
+        return {
+            'answers': self.answers,
+            'failures': self.failures,
+            'timeouts': self.timeouts,
+            'latency_ms': self.latency.snapshot(),
+        }
+
+
+class Metrics:
+    """Counters updated by :class:`Resolver` and :class:`AsyncResolver`.
+
+    Only lookups that go to the network are timed and counted by rcode;
+    timeouts are counted under the 'TIMEOUT' rcode.  ``retries`` counts
+    attempts after the first one of a lookup.  ``servers`` breaks the
+    attempts down by nameserver address, so a server that keeps failing
+    shows up even when another one answers in its place.  Timeouts count as
+    failures too.  Cache hits and misses are reported by the caches attached
+    to this instance and, like everything else, count from the last
+    :meth:`reset`.  Latencies in the snapshot are in milliseconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.latency = Histogram()
+            self.rcodes = Counter()
+            self.retries = 0
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.in_flight = 0
+            self.max_in_flight = 0
+            self.servers = {}
+
+    def cache_lookup(self, hit):
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+            if self.in_flight > self.max_in_flight:
+                self.max_in_flight = self.in_flight
+
+    def retried(self):
+        with self._lock:
+            self.retries += 1
+
+    def attempt_answered(self, server, elapsed):
+        with self._lock:
+            stats = self._server(server)
+            stats.answers += 1
+            stats.latency.observe(elapsed)
+
+    def attempt_failed(self, server, timed_out=False):
+        """Record an attempt that got no usable reply from ``server``."""
+        with self._lock:
+            stats = self._server(server)
+            stats.failures += 1
+            if timed_out:
+                stats.timeouts += 1
+
+    def _server(self, server):
+        stats = self.servers.get(server)
+        if stats is None:
+            stats = self.servers[server] = ServerStats()
+        return stats
+
+    def finished(self, elapsed, rcode):
+        """Record a lookup; ``rcode`` None means it was abandoned (e.g. cancelled)."""
+        with self._lock:
+            self.in_flight -= 1
+            if rcode is None:
+                return
+            self.latency.observe(elapsed)
+            self.rcodes[rcode] += 1
+
+    @property
+    def cache_hit_ratio(self):
+        total = self.cache_hits + self.cache_misses
+        return self.cache_hits / total if total else 0.0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'lookups': self.latency.count,
+                'in_flight': self.in_flight,
+                'max_in_flight': self.max_in_flight,
+                'retries': self.retries,
+                'rcodes': dict(self.rcodes),
+                'cache': {
+                    'hits': self.cache_hits,
+                    'misses': self.cache_misses,
+                    'hit_ratio': self.cache_hit_ratio,
+                },
+                'latency_ms': self.latency.snapshot(),
+                'servers': {server: stats.snapshot() for server, stats in self.servers.items()},
+            }
+
+    def dump(self, file=None):
+        """Write the snapshot as one JSON line to ``file`` (default: stderr)."""
+        file = file or sys.stderr
+        file.write(json.dumps(self.snapshot()) + '\n')
+        file.flush()
+
+    def dump_at_exit(self, file=None):
+        atexit.register(self.dump, file)
+
+
+default_metrics = Metrics()
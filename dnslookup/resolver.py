@@ -0,0 +1,194 @@
+"""Blocking resolver that talks to the configured nameservers directly."""
+
+import secrets
+import socket
+import struct
+import time
+
+from . import wire
+from .cache import Cache
+from .metrics import default_metrics
+from .result import LookupResult
+
+RESOLV_CONF = '/etc/resolv.conf'
+DEFAULT_PORT = 53
+UDP_PAYLOAD = 4096
+
+# socket.timeout is only an alias of TimeoutError from Python 3.10.
+TIMEOUT_ERRORS = (TimeoutError, socket.timeout)
+
+
+class ResolveError(Exception):
+    """Raised when a lookup completes with a non-NOERROR rcode."""
+
+    def __init__(self, name, rcode):
+        super().__init__(f'{name}: {rcode}')
+        self.name = name
+        self.rcode = rcode
+
+
+class Timeout(ResolveError):
+    """Raised when no nameserver answered within the allowed attempts."""
+
+    def __init__(self, name):
+        Exception.__init__(self, f'{name}: timed out')
+        self.name = name
+        self.rcode = None
+
+
+def read_nameservers(path=RESOLV_CONF):
+    """Return the nameserver addresses listed in a resolv.conf file.
+
+    Other settings (``search``, ``domain``, ``options``) are ignored.
+    """
+    servers = []
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 2 and fields[0] == 'nameserver':
+                    servers.append(fields[1].split('%')[0])
+    except OSError:
+        pass
+    return servers or ['127.0.0.1']
+
+
+def new_query_id():
+    return secrets.randbits(16)
+
+
+def is_reply(msg, qid, name, rdtype):
+    """Check that ``msg`` answers the question we asked."""
+    return (msg.id == qid and msg.flags & wire.FLAG_QR
+            and wire.normalize_name(msg.qname) == wire.normalize_name(name)
+            and msg.qtype == wire.rdtype_name(wire.rdtype_code(rdtype)))
+
+
+def attempts(nameservers, retries):
+    """Yield the server for each attempt: ``retries + 1`` passes over the list."""
+    for _ in range(retries + 1):
+        yield from nameservers
+
+
+def is_truncated(data):
+    return len(data) >= 4 and bool(data[2] << 8 & wire.FLAG_TC)
+
+
+def address_family(server):
+    return socket.AF_INET6 if ':' in server else socket.AF_INET
+
+
+def _recv_exact(sock, size):
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError('connection closed by nameserver')
+        buf += chunk
+    return bytes(buf)
+
+
+class Resolver:
+    """Send queries over UDP (falling back to TCP on truncation).
+
+    Each attempt walks the nameserver list once; ``retries`` extra passes are
+    made before giving up with :class:`Timeout`.  Answers are served from
+    ``cache`` (a :class:`dnslookup.cache.Cache`) when one is given.  Outcomes
+    are recorded in ``metrics`` (default: :data:`metrics.default_metrics`).
+
+    Names are always queried as given: the ``search``, ``domain`` and
+    ``ndots`` settings of resolv.conf are not applied, so a single-label name
+    that nslookup would complete through the search list comes back
+    NXDOMAIN.  Pass fully qualified names.
+    """
+
+    def __init__(self, nameservers=None, port=DEFAULT_PORT, timeout=2.0, retries=2,
+                 cache=None, metrics=None):
+        self.nameservers = list(nameservers or read_nameservers())
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.cache = cache
+        self.metrics = metrics or default_metrics
+        if cache is not None and cache.metrics is None:
+            cache.metrics = self.metrics
+
+    def query(self, name, rdtype='A'):
+        """Return the :class:`LookupResult` for ``name``/``rdtype``."""
+        if self.cache is None:
+            return self._query(name, rdtype)
+        result = self.cache.get(name, rdtype)
+        if result is None:
+            result = self._query(name, rdtype)
+            self.cache.put(name, rdtype, result)
+        return result
+
+    def _query(self, name, rdtype):
+        start = time.perf_counter()
+        self.metrics.started()
+        rcode = None
+        try:
+            for attempt, server in enumerate(attempts(self.nameservers, self.retries)):
+                if attempt:
+                    self.metrics.retried()
+                qid = new_query_id()
+                request = wire.build_query(name, rdtype, qid)
+                attempt_start = time.perf_counter()
+                try:
+                    data = self._udp(server, request, qid)
+                    if is_truncated(data):
+                        data = self._tcp(server, request)
+                    msg = wire.parse_response(data)
+                except (OSError, ValueError) as exc:
+                    self.metrics.attempt_failed(server, isinstance(exc, TIMEOUT_ERRORS))
+                    continue
+                if not is_reply(msg, qid, name, rdtype):
+                    self.metrics.attempt_failed(server)
+                    continue
+                self.metrics.attempt_answered(server, time.perf_counter() - attempt_start)
+                result = LookupResult.from_message(msg, server, time.perf_counter() - start)
+                rcode = result.rcode
+                return result
+            rcode = 'TIMEOUT'
+            raise Timeout(name)
+        finally:
+            self.metrics.finished(time.perf_counter() - start, rcode)
+
+    def resolve(self, name, rdtype='A'):
+        """Return the answer data for ``name``, raising ResolveError on failure."""
+        result = self.query(name, rdtype)
+        if not result.ok:
+            raise ResolveError(name, result.rcode)
+        return list(result.answers)
+
+    def _udp(self, server, request, qid):
+        with socket.socket(address_family(server), socket.SOCK_DGRAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect((server, self.port))
+            sock.send(request)
+            while True:
+                data = sock.recv(UDP_PAYLOAD)
+                # Stray datagrams for other ids are ignored, not treated as errors.
+                if len(data) >= 2 and int.from_bytes(data[:2], 'big') == qid:
+                    return data
+
+    def _tcp(self, server, request):
+        with socket.create_connection((server, self.port), self.timeout) as sock:
+            sock.sendall(struct.pack('!H', len(request)) + request)
+            size = struct.unpack('!H', _recv_exact(sock, 2))[0]
+            return _recv_exact(sock, size)
+
+
+_default = None
+
+
+def get_default_resolver():
+    global _default
+    if _default is None:
+        _default = Resolver(cache=Cache())
+    return _default
+
+
+def resolve(name, rdtype='A'):
+    """Resolve ``name`` with the default resolver built from resolv.conf."""
+    return get_default_resolver().resolve(name, rdtype)
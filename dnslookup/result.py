@@ -0,0 +1,61 @@
+"""Structured lookup results."""
+
+from . import wire
+
+
+class LookupResult:
+    """Outcome of one lookup.
+
+    ``answers`` and ``ttls`` are parallel tuples holding the records of the
+    queried type (CNAMEs followed on the way are not included).  ``rcode`` is
+    the response code name, e.g. 'NOERROR' or 'NXDOMAIN'.  ``elapsed`` is the
+    wall time of the lookup in seconds, retries included; a result served from
+    the cache keeps the values of the lookup that filled it.
+
+    Results are immutable: the cache hands the same instance to every caller,
+    and they hash by value.
+    """
+
+    __slots__ = ('name', 'rdtype', 'answers', 'ttls', 'server', 'rcode', 'elapsed')
+
+    def __init__(self, name, rdtype, answers=(), ttls=(), server=None, rcode='NOERROR',
+                 elapsed=0.0):
+        values = (name, rdtype, tuple(answers), tuple(ttls), server, rcode, elapsed)
+        for slot, value in zip(self.__slots__, values):
+            object.__setattr__(self, slot, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    @classmethod
+    def from_message(cls, msg, server, elapsed):
+        records = [record for record in msg.answers if record.rdtype == msg.qtype]
+        return cls(msg.qname, msg.qtype,
+                   [record.data for record in records],
+                   [record.ttl for record in records],
+                   server, wire.rcode_name(msg.rcode), elapsed)
+
+    @property
+    def ok(self):
+        return self.rcode == 'NOERROR'
+
+    def as_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def _fields(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __eq__(self, other):
+        if not isinstance(other, LookupResult):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __hash__(self):
+        return hash(self._fields())
+
+    def __repr__(self):
+        fields = ', '.join(f'{slot}={value!r}' for slot, value in zip(self.__slots__, self._fields()))
+        return f'{type(self).__name__}({fields})'
@@ -0,0 +1,207 @@
+"""Canned-answer DNS server on loopback, for benchmarks and offline checks."""
+
+import asyncio
+import socket
+import struct
+import threading
+
+from . import wire
+
+UDP_LIMIT = 512
+
+
+def encode_rdata(rdtype, data):
+    if rdtype == 'A':
+        return socket.inet_pton(socket.AF_INET, data)
+    if rdtype == 'AAAA':
+        return socket.inet_pton(socket.AF_INET6, data)
+    if rdtype in ('CNAME', 'NS', 'PTR'):
+        return wire.encode_name(data)
+    if rdtype == 'MX':
+        preference, exchange = data.split()
+        return struct.pack('!H', int(preference)) + wire.encode_name(exchange)
+    if rdtype == 'TXT':
+        raw = data.encode('utf-8')
+        return b''.join(bytes([len(raw[i:i + 255])]) + raw[i:i + 255]
+                        for i in range(0, len(raw), 255)) or b'\x00'
+    raise ValueError(f'stub cannot encode {rdtype} records')
+
+
+def truncate(response):
+    """Strip ``response`` to its header and question and set TC."""
+    qid, flags = struct.unpack_from('!HH', response, 0)
+    end = wire.decode_name(response, 12)[1] + 4
+    return struct.pack('!HHHHHH', qid, flags | wire.FLAG_TC, 1, 0, 0, 0) + response[12:end]
+
+
+class Zone:
+    """Answers served by :class:`StubServer`.
+
+    ``records`` maps ``(name, rdtype)`` to a list of data strings.  Names in
+    ``servfail`` get SERVFAIL, names in ``drop`` are never answered, and names
+    in ``delay`` are answered after that many seconds.  Anything else is
+    NXDOMAIN.  After construction, use :meth:`add`, :meth:`add_servfail`,
+    :meth:`add_drop` and :meth:`set_delay` rather than the attributes, so
+    names are normalized and owner names stay indexed for the NXDOMAIN check.
+    """
+
+    def __init__(self, records=None, ttl=300, servfail=(), drop=(), delay=None):
+        self.records = {}
+        self.owners = set()
+        for (name, rdtype), values in (records or {}).items():
+            self.add(name, rdtype, *values)
+        self.ttl = ttl
+        self.servfail = set()
+        self.drop = set()
+        self.delay = {}
+        for name in servfail:
+            self.add_servfail(name)
+        for name in drop:
+            self.add_drop(name)
+        for name, seconds in (delay or {}).items():
+            self.set_delay(name, seconds)
+
+    def add(self, name, rdtype, *values):
+        key = wire.normalize_name(name), rdtype.upper()
+        self.records.setdefault(key, []).extend(values)
+        self.owners.add(key[0])
+
+    def add_servfail(self, name):
+        self.servfail.add(wire.normalize_name(name))
+
+    def add_drop(self, name):
+        self.drop.add(wire.normalize_name(name))
+
+    def set_delay(self, name, seconds):
+        self.delay[wire.normalize_name(name)] = seconds
+
+    def answer(self, query):
+        """Return ``(response, delay)`` for a raw query, or None to stay silent."""
+        qid, _, qdcount, _, _, _ = struct.unpack_from('!HHHHHH', query, 0)
+        if qdcount != 1:
+            return None
+        qname, offset = wire.decode_name(query, 12)
+        code = struct.unpack_from('!H', query, offset)[0]
+        question = query[12:offset + 4]
+        name = wire.normalize_name(qname)
+        if name in self.drop:
+            return None
+        rdtype = wire.rdtype_name(code)
+        values = self.records.get((name, rdtype), [])
+        if name in self.servfail:
+            rcode = 2
+        elif name in self.owners:
+            rcode = 0
+        else:
+            rcode = 3
+        answers = b''
+        if rcode == 0:
+            for data in values:
+                rdata = encode_rdata(rdtype, data)
+                answers += b'\xc0\x0c' + struct.pack('!HHIH', code, wire.CLASS_IN, self.ttl,
+                                                     len(rdata)) + rdata
+        flags = wire.FLAG_QR | wire.FLAG_RD | 0x0080 | rcode
+        header = struct.pack('!HHHHHH', qid, flags, 1, len(values) if rcode == 0 else 0, 0, 0)
+        return header + question + answers, self.delay.get(name, 0)
+
+
+class _UDPProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self, zone):
+        self.zone = zone
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            reply = self.zone.answer(data)
+        except (ValueError, IndexError, struct.error):
+            return
+        if reply is None:
+            return
+        response, delay = reply
+        if len(response) > UDP_LIMIT:
+            response = truncate(response)
+        if delay:
+            asyncio.get_running_loop().call_later(delay, self.transport.sendto, response, addr)
+        else:
+            self.transport.sendto(response, addr)
+
+
+class StubServer:
+    """Serve a :class:`Zone` over UDP and TCP from a background thread.
+
+    Use as a context manager; ``port`` is filled in once the server is up::
+
+        with StubServer(zone) as server:
+            Resolver(['127.0.0.1'], port=server.port).query('example.test')
+    """
+
+    def __init__(self, zone, host='127.0.0.1', port=0):
+        self.zone = zone
+        self.host = host
+        self.port = port
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='dns-stub', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+            self._thread.join()
+            self._loop = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except Exception as exc:  # surfaced to start()
+            self._error = exc
+            self._ready.set()
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        transport, _ = await self._loop.create_datagram_endpoint(
+            lambda: _UDPProtocol(self.zone), local_addr=(self.host, self.port))
+        self.port = transport.get_extra_info('sockname')[1]
+        server = await asyncio.start_server(self._handle_tcp, self.host, self.port)
+        self._ready.set()
+        try:
+            await self._stop.wait()
+        finally:
+            transport.close()
+            server.close()
+            await server.wait_closed()
+
+    async def _handle_tcp(self, reader, writer):
+        try:
+            while True:
+                size = struct.unpack('!H', await reader.readexactly(2))[0]
+                reply = self.zone.answer(await reader.readexactly(size))
+                if reply is None:
+                    continue
+                response, delay = reply
+                if delay:
+                    await asyncio.sleep(delay)
+                writer.write(struct.pack('!H', len(response)) + response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError, struct.error):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,193 @@
+"""DNS message encoding and decoding (RFC 1035)."""
+
+import socket
+import struct
+from typing import NamedTuple
+
+TYPES = {
+    'A': 1,
+    'NS': 2,
+    'CNAME': 5,
+    'SOA': 6,
+    'PTR': 12,
+    'MX': 15,
+    'TXT': 16,
+    'AAAA': 28,
+    'SRV': 33,
+}
+TYPE_NAMES = {value: key for key, value in TYPES.items()}
+
+RCODES = {
+    0: 'NOERROR',
+    1: 'FORMERR',
+    2: 'SERVFAIL',
+    3: 'NXDOMAIN',
+    4: 'NOTIMP',
+    5: 'REFUSED',
+}
+
+CLASS_IN = 1
+FLAG_QR = 0x8000
+FLAG_TC = 0x0200
+FLAG_RD = 0x0100
+
+_HEADER = struct.Struct('!HHHHHH')
+_RR = struct.Struct('!HHIH')
+_MAX_POINTERS = 64
+
+
+class Record(NamedTuple):
+    name: str
+    rdtype: str
+    ttl: int
+    data: str
+
+
+class Message(NamedTuple):
+    id: int
+    flags: int
+    rcode: int
+    qname: str
+    qtype: str
+    answers: list
+
+
+def rdtype_code(rdtype):
+    """Return the numeric code for ``rdtype`` (a name such as 'A' or an int)."""
+    if isinstance(rdtype, int):
+        return rdtype
+    try:
+        return TYPES[rdtype.upper()]
+    except KeyError:
+        raise ValueError(f'unsupported record type: {rdtype!r}') from None
+
+
+def rdtype_name(code):
+    return TYPE_NAMES.get(code, f'TYPE{code}')
+
+
+def rcode_name(code):
+    return RCODES.get(code, f'RCODE{code}')
+
+
+def normalize_name(name):
+    """Return the lower-case ASCII (IDNA) form of ``name`` without the trailing dot.
+
+    This is the form names take on the wire, so it is used for comparisons
+    and keys.  Names that IDNA rejects are only lower-cased.
+    """
+    name = name.rstrip('.')
+    if not name.isascii():
+        try:
+            name = name.encode('idna').decode('ascii')
+        except UnicodeError:
+            pass
+    return name.lower()
+
+
+def encode_name(name):
+    name = name.rstrip('.')
+    if not name:
+        return b'\x00'
+    try:
+        encoded = name.encode('idna')
+    except UnicodeError as exc:
+        raise ValueError(f'invalid domain name {name!r}: {exc}') from None
+    labels = encoded.split(b'.')
+    out = bytearray()
+    for label in labels:
+        if not 0 < len(label) < 64:
+            raise ValueError(f'invalid domain name {name!r}: bad label length')
+        out.append(len(label))
+        out += label
+    out.append(0)
+    if len(out) > 255:
+        raise ValueError(f'invalid domain name {name!r}: longer than 255 octets')
+    return bytes(out)
+
+
+def build_query(name, rdtype, qid):
+    """Build a recursive query for ``name``/``rdtype`` with message id ``qid``."""
+    header = _HEADER.pack(qid, FLAG_RD, 1, 0, 0, 0)
+    return header + encode_name(name) + struct.pack('!HH', rdtype_code(rdtype), CLASS_IN)
+
+
+def decode_name(data, offset):
+    """Decode a possibly compressed name at ``offset``; return (name, next_offset)."""
+    labels = []
+    end = None
+    jumps = 0
+    while True:
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            jumps += 1
+            if jumps > _MAX_POINTERS:
+                raise ValueError('compression pointer loop')
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        if length & 0xC0:
+            raise ValueError('unsupported label type')
+        offset += 1
+        if length == 0:
+            break
+        labels.append(data[offset:offset + length].decode('ascii', 'replace'))
+        offset += length
+    return '.'.join(labels), offset if end is None else end
+
+
+def _decode_rdata(data, offset, length, code):
+    rdata = data[offset:offset + length]
+    if code == 1 and length == 4:
+        return socket.inet_ntop(socket.AF_INET, rdata)
+    if code == 28 and length == 16:
+        return socket.inet_ntop(socket.AF_INET6, rdata)
+    if code in (2, 5, 12):
+        return decode_name(data, offset)[0]
+    if code == 15:
+        preference = struct.unpack_from('!H', data, offset)[0]
+        return f'{preference} {decode_name(data, offset + 2)[0]}'
+    if code == 33:
+        priority, weight, port = struct.unpack_from('!HHH', data, offset)
+        return f'{priority} {weight} {port} {decode_name(data, offset + 6)[0]}'
+    if code == 6:
+        mname, pos = decode_name(data, offset)
+        rname, pos = decode_name(data, pos)
+        serial, refresh, retry, expire, minimum = struct.unpack_from('!IIIII', data, pos)
+        return f'{mname} {rname} {serial} {refresh} {retry} {expire} {minimum}'
+    if code == 16:
+        parts = []
+        pos = 0
+        while pos < length:
+            size = rdata[pos]
+            parts.append(rdata[pos + 1:pos + 1 + size].decode('utf-8', 'replace'))
+            pos += 1 + size
+        return ''.join(parts)
+    return rdata.hex()
+
+
+def parse_response(data):
+    """Parse a response message; only the answer section is decoded."""
+    try:
+        qid, flags, qdcount, ancount, _, _ = _HEADER.unpack_from(data, 0)
+        offset = _HEADER.size
+        qname, qtype = '', ''
+        for _ in range(qdcount):
+            qname, offset = decode_name(data, offset)
+            qtype = rdtype_name(struct.unpack_from('!H', data, offset)[0])
+            offset += 4
+        answers = []
+        for _ in range(ancount):
+            name, offset = decode_name(data, offset)
+            code, rdclass, ttl, length = _RR.unpack_from(data, offset)
+            offset += _RR.size
+            if offset + length > len(data):
+                raise ValueError('truncated resource record')
+            if rdclass == CLASS_IN:
+                answers.append(Record(name, rdtype_name(code), ttl,
+                                      _decode_rdata(data, offset, length, code)))
+            offset += length
+    except (IndexError, struct.error) as exc:
+        raise ValueError(f'malformed DNS message: {exc}') from None
+    return Message(qid, flags, flags & 0x000F, qname, qtype, answers)
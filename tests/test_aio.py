@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from dnslookup import AsyncResolver, Cache, Metrics, Timeout, resolve_as_completed, resolve_many
+from dnslookup.stub import StubServer, Zone
+
+NAMES = [f'host{i}.test' for i in range(40)]
+
+
+@pytest.fixture(scope='module')
+def server():
+    zone = Zone(drop=['gone.test'], servfail=['broken.test'])
+    for i, name in enumerate(NAMES):
+        zone.add(name, 'A', f'192.0.2.{i}')
+        if i % 3 == 0:
+            zone.set_delay(name, 0.02)
+    with StubServer(zone) as stub:
+        yield stub
+
+
+def make_resolver(server, **options):
+    options.setdefault('timeout', 0.2)
+    options.setdefault('retries', 0)
+    options.setdefault('metrics', Metrics())
+    return AsyncResolver(['127.0.0.1'], port=server.port, **options)
+
+
+def test_resolve_many_keeps_input_order(server):
+    names = NAMES + ['missing.test', 'broken.test']
+    results = asyncio.run(resolve_many(names, concurrency=8, resolver=make_resolver(server)))
+    assert [result.name for result in results] == names
+    assert [result.answers for result in results[:3]] == [('192.0.2.0',), ('192.0.2.1',),
+                                                          ('192.0.2.2',)]
+    assert [result.rcode for result in results[-2:]] == ['NXDOMAIN', 'SERVFAIL']
+
+
+def test_resolve_as_completed_yields_every_name(server):
+    async def collect():
+        return [name async for name, _ in resolve_as_completed(
+            iter(NAMES), concurrency=4, resolver=make_resolver(server))]
+
+    names = asyncio.run(collect())
+    assert sorted(names) == sorted(NAMES)
+    assert names != NAMES  # delayed names finish after later fast ones
+
+
+def test_concurrency_bounds_lookups_in_flight(server):
+    resolver = make_resolver(server)
+    asyncio.run(resolve_many(NAMES, concurrency=5, resolver=resolver))
+    assert 1 < resolver.metrics.max_in_flight <= 5
+
+
+def test_dropped_name_times_out_after_every_pass(server):
+    resolver = make_resolver(server, timeout=0.05, retries=2)
+    [result] = asyncio.run(resolve_many(['gone.test'], resolver=resolver))
+    assert isinstance(result, Timeout)
+    snapshot = resolver.metrics.snapshot()
+    assert snapshot['retries'] == 2
+    assert snapshot['servers']['127.0.0.1']['timeouts'] == 3
+    assert snapshot['rcodes'] == {'TIMEOUT': 1}
+
+
+def test_invalid_name_is_returned_as_error(server):
+    [result] = asyncio.run(resolve_many(['bad..test'], resolver=make_resolver(server)))
+    assert isinstance(result, ValueError)
+
+
+def test_repeated_name_shares_one_query(server):
+    resolver = make_resolver(server, cache=Cache())
+    results = asyncio.run(resolve_many([NAMES[0]] * 20, concurrency=20, resolver=resolver))
+    assert len({id(result) for result in results}) == 1
+    assert resolver.metrics.snapshot()['lookups'] == 1
+
+
+def test_concurrency_must_be_positive(server):
+    with pytest.raises(ValueError):
+        asyncio.run(resolve_many(NAMES, concurrency=0, resolver=make_resolver(server)))
@@ -0,0 +1,101 @@
+import pytest
+
+from dnslookup.cache import Cache
+from dnslookup.result import LookupResult
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def answer(name, *ttls, rcode='NOERROR'):
+    return LookupResult(name, 'A', [f'192.0.2.{i}' for i in range(len(ttls))], ttls, rcode=rcode)
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def test_positive_answer_expires_with_smallest_ttl(clock):
+    cache = Cache(clock=clock)
+    result = answer('a.test', 60, 10)
+    cache.put('a.test', 'A', result)
+    clock.now = 9.9
+    assert cache.get('a.test', 'A') is result
+    clock.now = 10
+    assert cache.get('a.test', 'A') is None
+    assert len(cache) == 0
+
+
+def test_max_ttl_caps_lifetime(clock):
+    cache = Cache(max_ttl=5, clock=clock)
+    cache.put('a.test', 'A', answer('a.test', 3600))
+    clock.now = 5
+    assert cache.get('a.test', 'A') is None
+
+
+@pytest.mark.parametrize('result', [
+    answer('a.test', rcode='NXDOMAIN'),
+    answer('a.test', rcode='SERVFAIL'),
+    answer('a.test'),
+])
+def test_negative_ttl(clock, result):
+    cache = Cache(negative_ttl=30, clock=clock)
+    cache.put('a.test', 'A', result)
+    clock.now = 29
+    assert cache.get('a.test', 'A') is result
+    clock.now = 30
+    assert cache.get('a.test', 'A') is None
+
+
+@pytest.mark.parametrize('result', [
+    answer('a.test', rcode='REFUSED'),
+    answer('a.test', 0),
+])
+def test_not_cached(clock, result):
+    cache = Cache(clock=clock)
+    cache.put('a.test', 'A', result)
+    assert len(cache) == 0
+    assert cache.get('a.test', 'A') is None
+
+
+def test_keys_are_normalized(clock):
+    cache = Cache(clock=clock)
+    result = answer('xn--bcher-kva.test', 60)
+    cache.put('Bücher.TEST.', 'a', result)
+    assert cache.get('xn--bcher-kva.test', 1) is result
+    assert cache.get('xn--bcher-kva.test', 'AAAA') is None
+
+
+def test_lru_eviction_order(clock):
+    cache = Cache(maxsize=2, clock=clock)
+    for name in ('a.test', 'b.test'):
+        cache.put(name, 'A', answer(name, 60))
+    assert cache.get('a.test', 'A') is not None  # b.test is now least recently used
+    cache.put('c.test', 'A', answer('c.test', 60))
+    assert cache.get('b.test', 'A') is None
+    assert cache.get('a.test', 'A') is not None
+    assert cache.get('c.test', 'A') is not None
+    assert cache.evictions == 1
+
+
+def test_stats(clock):
+    cache = Cache(clock=clock)
+    cache.put('a.test', 'A', answer('a.test', 60))
+    cache.get('a.test', 'A')
+    cache.get('b.test', 'A')
+    cache.get('a.test', 'A')
+    assert cache.stats() == {
+        'size': 1, 'hits': 2, 'misses': 1, 'evictions': 0, 'hit_ratio': 2 / 3,
+    }
+
+
+def test_maxsize_must_be_positive():
+    with pytest.raises(ValueError):
+        Cache(maxsize=0)
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+
+from dnslookup.cli import LONG_LINE_HEAD, format_result, read_names
+from dnslookup.resolver import Timeout
+from dnslookup.result import LookupResult
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def names_from_pipe(data):
+    read_fd, write_fd = os.pipe()
+
+    def write():
+        with os.fdopen(write_fd, 'wb') as writer:
+            writer.write(data)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+
+    async def collect():
+        return [name async for name in read_names(reader)]
+
+    with os.fdopen(read_fd, 'rb') as reader:
+        names = asyncio.run(collect())
+    writer.join()
+    return names
+
+
+def test_pipe_skips_blank_lines_and_comments():
+    data = b'a.test\n\n   \n# comment\n  b.test  \nc.test'
+    assert names_from_pipe(data) == ['a.test', 'b.test', 'c.test']
+
+
+def test_pipe_overlong_line_is_cut_and_the_stream_continues():
+    data = b'a.test\n' + b'x' * 70000 + b'\nb.test\n' + b'y' * 200000
+    assert names_from_pipe(data) == ['a.test', 'x' * LONG_LINE_HEAD, 'b.test',
+                                     'y' * LONG_LINE_HEAD]
+
+
+def test_format_result_uses_input_name():
+    result = LookupResult('xn--bcher-kva.test', 'A', ['192.0.2.1'], [60], '127.0.0.1',
+                          elapsed=0.5)
+    assert format_result('Bücher.test', result) == {
+        'name': 'Bücher.test', 'rdtype': 'A', 'answers': ('192.0.2.1',), 'ttls': (60,),
+        'server': '127.0.0.1', 'rcode': 'NOERROR', 'elapsed': 0.5,
+        'qname': 'xn--bcher-kva.test',
+    }
+
+
+def test_format_result_error():
+    assert format_result('gone.test', Timeout('gone.test')) == {
+        'name': 'gone.test', 'error': 'gone.test: timed out',
+    }
+
+
+def names_from_file(path):
+    async def collect():
+        with open(path, 'rb') as f:
+            return [name async for name in read_names(f)]
+
+    return asyncio.run(collect())
+
+
+def test_file_overlong_line_and_undecodable_bytes(tmp_path):
+    path = tmp_path / 'names.txt'
+    path.write_bytes(b'a.test\n' + b'x' * 70000 + b'\n\xff\xfe.test\n# c\nb.test')
+    assert names_from_file(path) == ['a.test', 'x' * LONG_LINE_HEAD, '��.test',
+                                     'b.test']
+
+
+def test_stdin_redirect_from_file_decodes_leniently(tmp_path):
+    path = tmp_path / 'names.txt'
+    path.write_bytes(b'\xff.test\n' + b'x' * 70000 + b'\n')
+    env = dict(os.environ, LC_ALL='C.UTF-8', PYTHONIOENCODING='')
+    with open(path, 'rb') as stdin:
+        proc = subprocess.run(
+            [sys.executable, '-m', 'dnslookup', '-s', '127.0.0.1', '-p', '9',
+             '--timeout', '0.05', '--retries', '0'],
+            stdin=stdin, capture_output=True, env=env, cwd=ROOT, check=True)
+    records = [json.loads(line) for line in proc.stdout.splitlines()]
+    assert sorted(record['name'] for record in records) == sorted(['�.test', 'x' * LONG_LINE_HEAD])
+    assert all('error' in record for record in records)
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from dnslookup import AsyncResolver, Cache, Metrics, Resolver, Timeout, resolve_many
+from dnslookup.metrics import Histogram
+from dnslookup.stub import StubServer, Zone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def server():
+    zone = Zone({('a.test', 'A'): ['192.0.2.1'], ('b.test', 'A'): ['192.0.2.2']},
+                servfail=['broken.test'], drop=['gone.test'])
+    with StubServer(zone) as stub:
+        yield stub
+
+
+def test_cli_metrics_include_cache_figures(server):
+    proc = subprocess.run(
+        [sys.executable, '-m', 'dnslookup', '-s', '127.0.0.1', '-p', str(server.port),
+         '-c', '1', '--metrics'],
+        input='a.test\na.test\na.test\nb.test\n', capture_output=True, text=True,
+        cwd=ROOT, check=True)
+    snapshot = json.loads(proc.stderr)
+    assert snapshot['cache'] == {'hits': 2, 'misses': 2, 'hit_ratio': 0.5}
+    assert snapshot['lookups'] == 2
+
+
+def test_cache_reports_to_metrics_and_reset_clears():
+    metrics = Metrics()
+    cache = Cache(metrics=metrics)
+    cache.get('a.test')
+    assert metrics.snapshot()['cache'] == {'hits': 0, 'misses': 1, 'hit_ratio': 0.0}
+    metrics.reset()
+    assert metrics.snapshot()['cache'] == {'hits': 0, 'misses': 0, 'hit_ratio': 0.0}
+
+
+def test_histogram_quantile_reports_bucket_upper_bound():
+    histogram = Histogram(bounds=(0.001, 0.01, 0.1))
+    assert histogram.quantile(0.5) == 0.0
+    for value in [0.0005] * 50 + [0.005] * 49 + [0.05]:
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == 0.001
+    assert histogram.quantile(0.99) == 0.01
+    assert histogram.quantile(1.0) == 0.1
+    histogram.observe(5.0)
+    assert histogram.quantile(1.0) == 0.1
+    assert histogram.counts == [50, 49, 1, 1]
+
+
+def test_async_rcodes_and_in_flight(server):
+    metrics = Metrics()
+    resolver = AsyncResolver(['127.0.0.1'], port=server.port, timeout=0.05, retries=0,
+                             metrics=metrics)
+    names = ['a.test', 'b.test', 'missing.test', 'broken.test', 'gone.test']
+    asyncio.run(resolve_many(names, concurrency=3, resolver=resolver))
+    snapshot = metrics.snapshot()
+    assert snapshot['rcodes'] == {'NOERROR': 2, 'NXDOMAIN': 1, 'SERVFAIL': 1, 'TIMEOUT': 1}
+    assert snapshot['lookups'] == 5
+    assert snapshot['in_flight'] == 0
+    assert 1 < snapshot['max_in_flight'] <= 3
+    assert snapshot['latency_ms']['count'] == 5
+
+
+def test_dead_second_nameserver_is_attributed(server):
+    metrics = Metrics()
+    resolver = Resolver(['127.0.0.1', '127.0.0.2'], port=server.port, timeout=0.05,
+                        retries=1, metrics=metrics)
+    assert resolver.query('a.test').server == '127.0.0.1'
+    with pytest.raises(Timeout):
+        resolver.query('gone.test')
+    snapshot = metrics.snapshot()
+    assert snapshot['retries'] == 3
+    assert snapshot['rcodes'] == {'NOERROR': 1, 'TIMEOUT': 1}
+    live, dead = snapshot['servers']['127.0.0.1'], snapshot['servers']['127.0.0.2']
+    assert (live['answers'], live['failures'], live['timeouts']) == (1, 2, 2)
+    assert live['latency_ms']['count'] == 1
+    assert (dead['answers'], dead['failures']) == (0, 2)
+
+
+def test_cache_figures_outlive_the_resolver(server):
+    metrics = Metrics()
+
+    def lookups():
+        resolver = AsyncResolver(['127.0.0.1'], port=server.port, cache=Cache(),
+                                 metrics=metrics)
+        asyncio.run(resolve_many(['a.test', 'a.test', 'b.test'], concurrency=1,
+                                 resolver=resolver))
+
+    lookups()
+    assert metrics.snapshot()['cache'] == {'hits': 1, 'misses': 2, 'hit_ratio': 1 / 3}
@@ -0,0 +1,44 @@
+import pytest
+
+from dnslookup import wire
+from dnslookup.result import LookupResult
+
+
+def test_from_message_keeps_records_of_queried_type():
+    msg = wire.Message(1, 0x8180, 0, 'www.example.test', 'A', [
+        wire.Record('www.example.test', 'CNAME', 300, 'web.example.test'),
+        wire.Record('web.example.test', 'A', 60, '192.0.2.1'),
+        wire.Record('web.example.test', 'A', 30, '192.0.2.2'),
+    ])
+    result = LookupResult.from_message(msg, '127.0.0.1', 0.5)
+    assert result.answers == ('192.0.2.1', '192.0.2.2')
+    assert result.ttls == (60, 30)
+    assert (result.rcode, result.server, result.ok) == ('NOERROR', '127.0.0.1', True)
+
+
+def test_results_are_hashable():
+    first = LookupResult('a.test', 'A', ['192.0.2.1'], [60], '127.0.0.1')
+    second = LookupResult('a.test', 'A', ('192.0.2.1',), (60,), '127.0.0.1')
+    other = LookupResult('a.test', 'A', rcode='NXDOMAIN')
+    assert first == second
+    assert len({first, second, other}) == 2
+    assert {first: 1}[second] == 1
+
+
+def test_as_dict_has_every_field():
+    result = LookupResult('a.test', 'A', rcode='SERVFAIL', elapsed=0.25)
+    assert result.as_dict() == {
+        'name': 'a.test', 'rdtype': 'A', 'answers': (), 'ttls': (), 'server': None,
+        'rcode': 'SERVFAIL', 'elapsed': 0.25,
+    }
+
+
+def test_results_are_immutable():
+    result = LookupResult('a.test', 'A', ['192.0.2.1'], [60])
+    with pytest.raises(AttributeError):
+        result.answers = ('192.0.2.9',)
+    with pytest.raises(AttributeError):
+        del result.rcode
+    with pytest.raises(AttributeError):
+        result.extra = 1
+    assert result.answers == ('192.0.2.1',)
@@ -0,0 +1,128 @@
+import struct
+
+import pytest
+
+from dnslookup import wire
+from dnslookup.stub import Zone, truncate
+
+
+def reply(qname, rdtype, rdata, ttl=60, rcode=0):
+    """Answer a fresh query with one record whose owner is a pointer to the question."""
+    query = wire.build_query(qname, rdtype, 0x1234)
+    code = wire.rdtype_code(rdtype)
+    header = struct.pack('!HHHHHH', 0x1234, wire.FLAG_QR | wire.FLAG_RD | rcode, 1, 1, 0, 0)
+    record = b'\xc0\x0c' + struct.pack('!HHIH', code, wire.CLASS_IN, ttl, len(rdata)) + rdata
+    return header + query[12:] + record
+
+
+def test_build_query():
+    query = wire.build_query('Example.com.', 'MX', 7)
+    assert query[:12] == struct.pack('!HHHHHH', 7, wire.FLAG_RD, 1, 0, 0, 0)
+    assert query[12:] == b'\x07Example\x03com\x00' + struct.pack('!HH', 15, wire.CLASS_IN)
+
+
+@pytest.mark.parametrize('name', ['a..b', 'a' * 64 + '.test', '.'.join(['a' * 63] * 5)])
+def test_encode_name_rejects_invalid(name):
+    with pytest.raises(ValueError):
+        wire.encode_name(name)
+
+
+def test_encode_name_idna():
+    assert wire.encode_name('bücher.test') == b'\x0dxn--bcher-kva\x04test\x00'
+    assert wire.normalize_name('Bücher.TEST.') == 'xn--bcher-kva.test'
+
+
+def test_round_trip_through_stub_zone():
+    zone = Zone({
+        ('www.example.test', 'A'): ['192.0.2.1', '192.0.2.2'],
+        ('www.example.test', 'AAAA'): ['2001:db8::1'],
+        ('example.test', 'MX'): ['10 mail.example.test'],
+        ('example.test', 'TXT'): ['v=spf1 -all'],
+        ('alias.example.test', 'CNAME'): ['www.example.test'],
+    }, ttl=120)
+    cases = [
+        ('WWW.example.test', 'A', ['192.0.2.1', '192.0.2.2']),
+        ('www.example.test', 'AAAA', ['2001:db8::1']),
+        ('example.test', 'MX', ['10 mail.example.test']),
+        ('example.test', 'TXT', ['v=spf1 -all']),
+        ('alias.example.test', 'CNAME', ['www.example.test']),
+    ]
+    for name, rdtype, expected in cases:
+        response, _ = zone.answer(wire.build_query(name, rdtype, 99))
+        msg = wire.parse_response(response)
+        assert (msg.id, msg.rcode, msg.qname, msg.qtype) == (99, 0, name, rdtype)
+        assert [record.data for record in msg.answers] == expected
+        assert {record.ttl for record in msg.answers} == {120}
+
+
+def test_stub_rcodes():
+    zone = Zone({('a.test', 'A'): ['192.0.2.1']}, servfail=['bad.test'], drop=['gone.test'])
+    assert wire.parse_response(zone.answer(wire.build_query('a.test', 'AAAA', 1))[0]).rcode == 0
+    assert wire.parse_response(zone.answer(wire.build_query('b.test', 'A', 1))[0]).rcode == 3
+    assert wire.parse_response(zone.answer(wire.build_query('bad.test', 'A', 1))[0]).rcode == 2
+    assert zone.answer(wire.build_query('gone.test', 'A', 1)) is None
+
+
+def test_truncated_reply_keeps_question_only():
+    zone = Zone({('big.test', 'A'): [f'192.0.2.{i}' for i in range(60)]})
+    response = truncate(zone.answer(wire.build_query('big.test', 'A', 5))[0])
+    msg = wire.parse_response(response)
+    assert msg.flags & wire.FLAG_TC
+    assert (msg.qname, msg.answers) == ('big.test', [])
+
+
+def test_srv_rdata():
+    rdata = struct.pack('!HHH', 1, 5, 5060) + wire.encode_name('sip.example.test')
+    msg = wire.parse_response(reply('_sip._udp.example.test', 'SRV', rdata))
+    assert msg.answers[0].data == '1 5 5060 sip.example.test'
+
+
+def test_soa_rdata():
+    rdata = (wire.encode_name('ns.example.test') + wire.encode_name('admin.example.test')
+             + struct.pack('!IIIII', 2024010101, 3600, 600, 86400, 300))
+    msg = wire.parse_response(reply('example.test', 'SOA', rdata))
+    assert msg.answers[0].data == 'ns.example.test admin.example.test 2024010101 3600 600 86400 300'
+
+
+def test_mx_rdata_with_compression_pointer():
+    # The exchange is "mail" followed by a pointer back to the question name.
+    msg = wire.parse_response(reply('example.test', 'MX', struct.pack('!H', 10) + b'\x04mail\xc0\x0c'))
+    assert msg.answers[0] == wire.Record('example.test', 'MX', 60, '10 mail.example.test')
+
+
+def test_txt_rdata_joins_strings():
+    msg = wire.parse_response(reply('example.test', 'TXT', b'\x03abc\x03def'))
+    assert msg.answers[0].data == 'abcdef'
+
+
+def test_unknown_rdata_is_hex():
+    msg = wire.parse_response(reply('example.test', 99, b'\x01\x02'))
+    assert msg.answers[0].rdtype == 'TYPE99'
+    assert msg.answers[0].data == '0102'
+
+
+def test_pointer_loop_is_rejected():
+    data = struct.pack('!HHHHHH', 1, wire.FLAG_QR, 1, 0, 0, 0) + b'\xc0\x0c'
+    with pytest.raises(ValueError, match='loop'):
+        wire.parse_response(data)
+
+
+def test_truncated_record_is_rejected():
+    data = reply('example.test', 'A', bytes([192, 0, 2, 1]))
+    for size in (len(data) - 1, len(data) - 6, 14):
+        with pytest.raises(ValueError):
+            wire.parse_response(data[:size])
+
+
+def test_zone_setters_normalize_like_constructor():
+    built = Zone({('Bücher.test.', 'A'): ['192.0.2.1']}, servfail=['Bad.test.'],
+                 drop=['GONE.test'], delay={'Slow.test.': 0.5})
+    added = Zone()
+    added.add('bücher.test', 'A', '192.0.2.1')
+    added.add_servfail('bad.test')
+    added.add_drop('gone.test')
+    added.set_delay('slow.test', 0.5)
+    for zone in (built, added):
+        assert zone.owners == {'xn--bcher-kva.test'}
+        assert (zone.servfail, zone.drop, zone.delay) == (
+            {'bad.test'}, {'gone.test'}, {'slow.test': 0.5})